@@ -6,16 +6,22 @@ thread_initiators = defaultdict(int)  # Author -> Number of threads initiated
 thread_responders = defaultdict(set)  # Author -> Set of threads they responded to
 thread_response_counts = defaultdict(int)  # ThreadID -> Number of responses
 thread_times = {}  # ThreadID -> [start_time, last_response_time]
+data_version = 0  # bumped each time a new set of patches is published, for caching anything derived from them
 patches_df = None #pd.DataFrame() #= pd.DataFrame(columns=["PatchID", "Author", "ReviewedBy", "SignedOffBy","Date"])
 # New data structures to map names to their email addresses
 name_to_emails = defaultdict(set)  # Author Name -> Set of email addresses
 email_to_name = {}  # Email Address -> Author Name
+email_domain = {}  # Email Address -> domain, for every address in name_to_emails that has one
 
 
-# For some reason, I CANNOT use patches_df as a global variable without the following 2 functions
+# For some reason, I CANNOT use patches_df as a global variable without the following functions
 def get_patches():
     return patches_df
 
 def set_patches(df):
-    global patches_df
-    patches_df = df
\ No newline at end of file
+    global patches_df, data_version
+    patches_df = df
+    data_version += 1
+
+def get_data_version():
+    return data_version
\ No newline at end of file
@@ -20,21 +20,37 @@
 #    Author: Patrick Kutch
 ##############################################################################
 import os
-import subprocess
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-from bs4 import BeautifulSoup
+from lxml import etree
 from rich.console import Console
-from rich.table import Table
-from rich.progress import track
 from rich.progress import Progress
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import json
-import shutil
-import gzip
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import zlib
+import asyncio
+import aiohttp
 import re
 import random
+import threading
+import queue
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson is optional, it just makes the cache and completed index quicker to read and write
+try:
+    import orjson
+    json_loads = orjson.loads
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
 
 
 
@@ -44,42 +60,273 @@ __autor_email__ = "Patrick.Kutch@Gmail.com"
 __version__     = "24.12.30"
 
 b4_retry_count = 4 # add one
-b4_retry_interval = 10
 b4_thread_count = 10
-read_http_sleep = 10
-
-def json_file_to_list(filename: str):
-    """Read a dictionary from a json file."""
+http_max_connections = 20
+http_max_connections_per_host = 10
+# Requests per second across the index walkers and the downloads together.  This, rather than b4_thread_count,
+# is what sets the download speed, kept low as the server answers with 503s when pushed.  A 429/503 with
+# Retry-After or an exhausted X-RateLimit budget slows everything down further.  0 turns the limit off.
+http_requests_per_second = 10
+index_page_walkers = 4
+download_chunk_size = 262144  # bytes of a download read and decompressed at a time
+progress_update_interval = 0.25  # seconds between progress bar updates while downloading
+
+# HTTP statuses worth retrying, for both index pages and downloads, with get_backoff_delay between attempts
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
+
+# topic links on an index page end in /T/#t, the thread URL is the link without the #t anchor
+TOPIC_LINK_SUFFIX = '/T/#t'
+TOPIC_ANCHOR_LENGTH = len('#t')
+
+# anything that isn't safe to use in a directory name
+_SANITIZE_RE = re.compile(r'[^A-Za-z0-9_-]')
+
+# keep-alive session shared by the index walkers.  urllib3 only retries failed connections, error statuses are
+# left to walk_index so that a Retry-After pauses every request through the rate limiter, not just this one
+index_session = requests.Session()
+index_session.headers.update(HEADERS)
+index_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=index_page_walkers,
+                            max_retries=Retry(total=3, backoff_factor=0.5, respect_retry_after_header=False))
+index_session.mount("https://", index_adapter)
+index_session.mount("http://", index_adapter)
+
+# thread_url -> thread_dir for every thread already downloaded into the output dir
+completed_threads = {}
+completed_index_file = "completed.idx"
+
+class RateLimiter:
+    """
+    Token bucket shared by every request made to the server.
+
+    Tokens refill at 'rate' per second, up to a burst of 'rate' requests, a rate of 0
+    doesn't limit requests at all.  Either way, when the server asks us to back off
+    (a 429/503 with Retry-After, or an exhausted X-RateLimit budget), every caller is
+    held until that time has passed.
+    """
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returning the number of seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            if not self.rate:
+                return max(0.0, self.paused_until - now)
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait_time, self.paused_until - now)
+
+    def wait(self):
+        time.sleep(self.reserve())
+
+    async def wait_async(self):
+        await asyncio.sleep(self.reserve())
+
+    def pause(self, seconds):
+        """Hold all requests for the given number of seconds."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Honor any rate limit information the server sent back with a response."""
+        delay = get_retry_after(headers)
+        if delay is None and headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset = float(headers.get("X-RateLimit-Reset", ""))
+                # some servers send an epoch time, others the seconds left in the window
+                delay = reset - time.time() if reset > 1e9 else reset
+            except ValueError:
+                pass
+        if delay and delay > 0:
+            self.pause(delay)
+
+rate_limiter = RateLimiter(http_requests_per_second)
+
+class GunzipStream:
+    """
+    Decompress a gzip stream fed in arbitrary chunks, including one made of several
+    gzip members, giving the same result as gzip.decompress on the whole thing.
+    """
+    def __init__(self):
+        self.decompressor = None  # None between members
+        self.after_member = False  # at least one member has been read
+
+    def decompress(self, chunk):
+        """Return the data decompressed from the next chunk of the stream."""
+        data = []
+        while chunk:
+            if self.decompressor is None:
+                if self.after_member:
+                    # a member can be followed by zero padding, skipped the same way gzip.decompress does
+                    chunk = chunk.lstrip(b"\x00")
+                    if not chunk:
+                        break
+                self.decompressor = zlib.decompressobj(wbits=31)  # 31 = gzip header and trailer
+            data.append(self.decompressor.decompress(chunk))
+            if not self.decompressor.eof:
+                break
+            # end of this member, anything left over is the start of the next one
+            chunk = self.decompressor.unused_data
+            self.decompressor = None
+            self.after_member = True
+        return b"".join(data)
+
+    def finish(self):
+        """Check that the stream didn't stop part way through a member."""
+        if self.decompressor is not None:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+
+def get_retry_after(headers):
+    """Return the delay in seconds requested by a Retry-After header, or None."""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # can also be an HTTP date
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def get_backoff_delay(attempt, headers=None):
+    """Seconds to wait before retrying, preferring the server's Retry-After over exponential backoff."""
+    retry_after = get_retry_after(headers)
+    if retry_after is not None:
+        return retry_after
+    return min(60, (2 ** attempt) + random.uniform(0, 1))  # Exponential backoff with jitter
+
+def read_cache_file(filename: str, quiet=False):
+    """
+    Read the (page, topic_threads, next_stamp) entries from a json lines cache file, one at a time.
+    next_stamp is None for entries written before it was recorded.
+    """
     if filename:
         try:
-            print(f"Opening file: {filename}")
-            with open(filename, "rt") as fp:
-                return json.load(fp)
+            if not quiet:
+                print(f"Opening file: {filename}")
+            with open(filename, "rt", encoding="utf-8") as fp:
+                for line in fp:
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        # a partial last line if we were interrupted while writing it
+                        continue
+                    yield entry[0], entry[1], entry[2] if len(entry) > 2 else None
 
-        except Exception:
+        except OSError:
             pass
             #print(f"{filename} was invalid or empty.")
-    
-    return []
 
 
-def data_to_json_file(filename, dict_to_write):
-    """Write a dictionary (hash table) to a json file."""
-    #print(f"Writing to {filename}.")
-    with open(filename, "wt") as fp:
-        fp.write(json.dumps(dict_to_write))
+def append_cache_entry(fp, page, topic_threads, next_stamp):
+    """
+    Append a single page worth of topic threads to an open cache file, along with the
+    t= stamp of the page it links to next (0 for the last page of the index).
+    """
+    fp.write(json_dumps((page, topic_threads, next_stamp)) + "\n")
+    fp.flush()
+
+
+def compact_cache_file(filename):
+    """Rewrite the cache file, keeping only the newest entry for each page."""
+    entries = {}
+    for page, topic_threads, next_stamp in read_cache_file(filename, quiet=True):
+        entries[page] = (topic_threads, next_stamp)
+
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wt", encoding="utf-8") as fp:
+        for page, (topic_threads, next_stamp) in entries.items():
+            fp.write(json_dumps((page, topic_threads, next_stamp)) + "\n")
+    os.replace(tmp_filename, filename)
+
+
+def migrate_cache_file(old_filename, filename):
+    """
+    Convert a cache written by older versions, a single json list of (page, topic_threads)
+    pairs, to the json lines cache in filename.  The old file is removed once converted.
+    """
+    if os.path.exists(filename) or not os.path.exists(old_filename):
+        return
+
+    try:
+        with open(old_filename, "rt", encoding="utf-8") as fp:
+            entries = json.load(fp)
+    except (OSError, ValueError):
+        return  # an unreadable old cache is no worse than no cache
+
+    print(f"Converting {old_filename} to {filename}")
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wt", encoding="utf-8") as fp:
+        for page, topic_threads in entries:
+            fp.write(json_dumps((page, topic_threads, None)) + "\n")
+    os.replace(tmp_filename, filename)
+    os.remove(old_filename)
+
+
+def load_completed_index(output_dir):
+    """Load the index of threads already downloaded into output_dir."""
+    completed_threads.clear()
+    output_dir = os.path.abspath(output_dir)
+    try:
+        with open(os.path.join(output_dir, completed_index_file), "rt", encoding="utf-8") as fp:
+            for line in fp:
+                try:
+                    thread_url, dir_name = json_loads(line)
+                except ValueError:
+                    continue
+                completed_threads[thread_url] = os.path.join(output_dir, dir_name)
+    except OSError:
+        pass
+
+
+def record_completed_thread(fp, thread_url, thread_dir):
+    """Add a downloaded thread to the completed index."""
+    completed_threads[thread_url] = thread_dir
+    fp.write(json_dumps((thread_url, os.path.basename(thread_dir))) + "\n")
+
+
+def remove_partial_download(mbx_tmp_file_path):
+    """Remove whatever was written of a download that failed part way, if anything."""
+    try:
+        os.remove(mbx_tmp_file_path)
+    except OSError:
+        pass
+
+
+def write_thread_log(thread_dir, filename, text):
+    """Write a small log file into a thread's directory with a single open and write."""
+    with open(os.path.join(thread_dir, filename), "w") as fp:
+        fp.write(text)
+
+
+async def download_mbx_thread(session, semaphore, thread_url, base_url, thread_title, output_dir, max_retries=b4_retry_count):
+    # fetched on a previous run, no need to work out where it lives
+    thread_dir = completed_threads.get(thread_url)
+    if thread_dir:
+        return thread_dir
 
-       
-def download_mbx_thread(thread_url, base_url, thread_title, output_dir, max_retries=5):
     full_url = f"{base_url}{thread_url.lstrip('/')}"
     download_url = full_url.replace("/T/", "/t.mbox.gz")
     thread_id = thread_url.rstrip('/').split("/")[-2]
 
     orig_title = thread_title
-    if len(thread_title) > 200:
+    truncated = len(thread_title) > 200
+    if truncated:
         thread_title = thread_title[:200].rsplit(' ', 1)[0]
 
-    sanitized_title = re.sub(r'[^a-zA-Z0-9-_]', '_', thread_title).strip('_')
+    sanitized_title = _SANITIZE_RE.sub('_', thread_title).strip('_')
     if sanitized_title.upper() == "UNKNOWN":
         # when folks send a general email to the email distro,
         # the title becomes (unknown), so let's skip it
@@ -87,173 +334,226 @@ def download_mbx_thread(thread_url, base_url, thread_title, output_dir, max_retr
 
     thread_dir = os.path.abspath(os.path.join(output_dir, sanitized_title))
 
-    os.makedirs(thread_dir, exist_ok=True)
-
-    mbx_gz_file_path = os.path.join(thread_dir, f"{thread_id}.mbx.gz")
     mbx_file_path = os.path.join(thread_dir, f"{thread_id}.mbx")
 
-    # Check for the existence of any .mbx file in the thread_dir directory
-    if any(fname.endswith('.mbx') for fname in os.listdir(thread_dir)):
+    # already downloaded on an earlier run that didn't get as far as the completed index
+    if os.path.exists(mbx_file_path):
         return thread_dir
 
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-
-    for attempt in range(max_retries + 1):
-        try:
-            error_log_path = os.path.join(thread_dir, "error.txt")
-            # remove the error.txt file - this could be a retry
-            try:
-                os.remove(error_log_path)
-            except FileNotFoundError:
-                pass
-
-            response = requests.get(download_url, stream=True, headers=headers, timeout=(5, 30))
-            response.raise_for_status()
-
-            # read the .mbx compressed file and write it to local storage
-            with open(mbx_gz_file_path, "wb") as mbx_gz_file:
-                mbx_gz_file.write(response.content)
-
-            # uncompress the file
-            with gzip.open(mbx_gz_file_path, "rb") as gz_file, open(mbx_file_path, "wb") as mbx_file:
-                shutil.copyfileobj(gz_file, mbx_file)
-
-            # remove the compressed file
-            os.remove(mbx_gz_file_path)
+    os.makedirs(thread_dir, exist_ok=True)
 
-            with open(os.path.join(thread_dir, "download_info.txt"), "w") as meta_file:
-                meta_file.write(f"Download URL: {download_url}\nSaved as: {mbx_file_path}\n")
-                if len(orig_title) > 200:
-                    meta_file.write(f"Thread title was truncated:\n{orig_title}\n")
+    # remove the error.txt file - this could be a retry of a thread that failed on an earlier run
+    try:
+        os.remove(os.path.join(thread_dir, "error.txt"))
+    except FileNotFoundError:
+        pass
 
-            return thread_dir
+    # the .mbx is written under a temporary name so that it is only ever seen complete,
+    # its existence is what marks the thread as downloaded
+    mbx_tmp_file_path = mbx_file_path + ".tmp"
 
-        except requests.exceptions.RequestException as req_err:
-            if response.status_code == 503 and attempt < max_retries:
-                wait_time = (2 ** attempt) + random.uniform(0, 1)  # Exponential backoff with jitter
+    # only the download itself is retried, everything else above and below is done once
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                await rate_limiter.wait_async()
+                async with session.get(download_url) as response:
+                    rate_limiter.update_from_headers(response.headers)
+                    response.raise_for_status()
+
+                    # uncompress as the archive streams in, so only a chunk of it is held in memory
+                    gunzip = GunzipStream()
+                    with open(mbx_tmp_file_path, "wb") as mbx_file:
+                        async for chunk in response.content.iter_chunked(download_chunk_size):
+                            mbx_file.write(gunzip.decompress(chunk))
+                    gunzip.finish()
+            break
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+            if getattr(req_err, "status", None) in RETRY_STATUSES and attempt < max_retries:
+                wait_time = get_backoff_delay(attempt, getattr(req_err, "headers", None))
                 #print(f"503 Service Unavailable. Retrying in {wait_time:.2f} seconds... (Attempt {attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
+                # hold every request, not just this one, the server is telling us to slow down
+                rate_limiter.pause(wait_time)
                 continue
 
             print(f"{str(req_err)} downloading .mbx : {thread_dir} -> {download_url}")
 
-            with open(error_log_path, "w") as error_file:
-                error_file.write(f"HTTP Error: {str(req_err)}\nURL: {download_url}\n")
+            remove_partial_download(mbx_tmp_file_path)
+            write_thread_log(thread_dir, "error.txt", f"HTTP Error: {str(req_err)}\nURL: {download_url}\n")
             return None
 
         except OSError as os_err:
-            error_log_path = os.path.join(thread_dir, "error.txt")
-            with open(error_log_path, "w") as error_file:
-                error_file.write(f"File Error: {str(os_err)}\n")
+            remove_partial_download(mbx_tmp_file_path)
+            write_thread_log(thread_dir, "error.txt", f"File Error: {str(os_err)}\n")
             return None
 
         except Exception as req_err:
-            error_log_path = os.path.join(thread_dir, "error.txt")
-            with open(error_log_path, "w") as error_file:
-                error_file.write(f"Error: {str(req_err)}\nURL: {download_url}\n")
+            remove_partial_download(mbx_tmp_file_path)
+            write_thread_log(thread_dir, "error.txt", f"Error: {str(req_err)}\nURL: {download_url}\n")
             return None
 
-def get_page(url):
-    """Fetch and parse an HTML page using BeautifulSoup."""
-    response = requests.get(url)
-    response.raise_for_status()
-    return BeautifulSoup(response.text, "html.parser")
-
-def extract_topic_threads(soup):
-    """Extract topic thread URLs and titles from the page soup."""
-    topic_threads = []
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        if href.endswith('/T/#t'):
-            url = href.split('#')[0]
-            title = link.text.strip()
-            topic_threads.append((url, title))
-    return topic_threads
+    try:
+        os.replace(mbx_tmp_file_path, mbx_file_path)
 
-def fetch_all_threads(base_url, start_date, end_date,cacheFileName):
-    """Fetch all threads from a base URL until the specified oldest year."""
-    if start_date:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d")
-        start_date_str = start_date.strftime("%Y%m%d%H%M%S")
-        next_page = base_url.rstrip('/') + '/?t=' + start_date_str
-    else:
-        start_date = datetime.now()  # only used for progress bar
-        next_page = base_url
-        
-    first_page = next_page
-    
-    oldest_date = datetime.strptime(end_date, "%Y-%m-%d")
-    total_time_range = (start_date - oldest_date).total_seconds()
+        download_info = f"Download URL: {download_url}\nSaved as: {mbx_file_path}\n"
+        if truncated:
+            download_info += f"Thread title was truncated:\n{orig_title}\n"
+        write_thread_log(thread_dir, "download_info.txt", download_info)
 
-    thread_data = []  # Use a list instead of a set
-    cutoff_date = oldest_date
-    cache = json_file_to_list(cacheFileName)
-    newestCachedPage = 0
-    oldestCachedPage = 99999999999999
-    cachedTopics = {}
-
-    if cache:
-        checkForCachedData = True
-        for page, topic_threads in cache:  # Only process topic_threads from the cache
-            for thread_info in topic_threads:
-                if thread_info[0] not in cachedTopics:
-                    cachedTopics[thread_info[0]] = 1
-                    thread_data.append(thread_info)
-                else:
-                    pass  # ignore duplicates - they will be older
-
-            timestamp = page.split("t=")[-1]
-            try:
-                page_date = int(timestamp)
-                if page_date > newestCachedPage:
-                    newestCachedPage = page_date
-                if page_date < oldestCachedPage:
-                    oldestCachedPage = page_date
-            except ValueError:
-                continue
-    else:
-        checkForCachedData = False
+    except OSError as os_err:
+        remove_partial_download(mbx_tmp_file_path)
+        write_thread_log(thread_dir, "error.txt", f"File Error: {str(os_err)}\n")
+        return None
 
-    # Add progress tracking
-    with Progress() as progress:
-        progress_task = progress.add_task(f"[cyan]Fetching threads from {base_url}..", total=100)
+    except Exception as err:
+        remove_partial_download(mbx_tmp_file_path)
+        write_thread_log(thread_dir, "error.txt", f"Error: {str(err)}\nURL: {download_url}\n")
+        return None
+
+    return thread_dir
+
+async def fetch_mbx_files(thread_data, base_url, output_dir, concurrency, progress=None, task=None):
+    """Download the .mbx files for all threads concurrently, returning the threads that failed."""
+    connector = aiohttp.TCPConnector(limit=http_max_connections, limit_per_host=http_max_connections_per_host)
+    timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=30)
+    semaphore = asyncio.Semaphore(concurrency)
+    threadsWithErrors = []
+
+    with open(os.path.join(output_dir, completed_index_file), "at", encoding="utf-8") as index_fp:
+        async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+            async def process_thread(thread):
+                thread_url, thread_title = thread[0], thread[1]
+                retVal = await download_mbx_thread(session, semaphore, thread_url, base_url, thread_title, output_dir)
+
+                return retVal, thread
+
+            # batch the progress bar updates, small threads complete far faster than the bar needs redrawing
+            pending_advance = 0
+            last_update = time.monotonic()
+            for next_done in asyncio.as_completed([process_thread(thread) for thread in thread_data]):
+                thread_dir, threadInfo = await next_done
+                pending_advance += 1
+                if progress and time.monotonic() - last_update >= progress_update_interval:
+                    progress.update(task, advance=pending_advance)  # Increment the progress bar
+                    pending_advance = 0
+                    last_update = time.monotonic()
+                if not thread_dir:
+                    threadsWithErrors.append(threadInfo)
+                elif thread_dir != "skipped" and threadInfo[0] not in completed_threads:
+                    record_completed_thread(index_fp, threadInfo[0], thread_dir)
+
+            if progress and pending_advance:
+                progress.update(task, advance=pending_advance)
+
+    return threadsWithErrors
+
+class IndexPage:
+    """
+    A public-inbox index page, parsed as it streams in from the server so that
+    only a small window of the page is ever held in memory.
+    """
+    def __init__(self, response):
+        self.response = response
+        self.next_page = None  # href of the next (older) page, set once the links have been read
+
+    def links(self):
+        """Yield (href, text) for each link on the page as it is parsed."""
+        # public-inbox always serves UTF-8
+        parser = etree.HTMLPullParser(events=("end",), tag="a", encoding="utf-8")
+        with self.response:
+            for chunk in self.response.iter_content(65536):
+                parser.feed(chunk)
+                yield from self._read_links(parser)
+            parser.close()
+            yield from self._read_links(parser)
+
+    def _read_links(self, parser):
+        for _, elem in parser.read_events():
+            href = elem.get("href")
+            if elem.get("rel") == "next":
+                self.next_page = href
+            elif href:
+                yield href, "".join(elem.itertext())
+
+            # done with this link, and everything before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
 
-        while next_page:
+def get_page(url):
+    """Fetch an HTML page, leaving the body to be parsed as it streams in."""
+    rate_limiter.wait()
+    response = index_session.get(url, stream=True, timeout=(5, 30))
+    rate_limiter.update_from_headers(response.headers)
+    if not response.ok:
+        response.close()  # give the connection back to the pool before raising
+    response.raise_for_status()
+    return IndexPage(response)
+
+def extract_topic_threads(page):
+    """Extract topic thread URLs and titles from the page as it is parsed."""
+    for href, text in page.links():
+        if href.endswith(TOPIC_LINK_SUFFIX):
+            url = sys.intern(href[:-TOPIC_ANCHOR_LENGTH])
+            title = text.strip()
+            yield url, title
+
+@functools.lru_cache(maxsize=4096)
+def parse_timestamp(timestamp):
+    """Convert a public-inbox YYYYMMDDHHMMSS timestamp to a datetime, much faster than strptime."""
+    if len(timestamp) != 14 or not timestamp.isdigit():
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    return datetime(int(timestamp[0:4]), int(timestamp[4:6]), int(timestamp[6:8]),
+                    int(timestamp[8:10]), int(timestamp[10:12]), int(timestamp[12:14]))
+
+
+def walk_index(base_url, segment, first_page, cutoff_date, cached_pages, pages, stop_walking):
+    """
+    Walk the index pages from first_page back to cutoff_date, putting
+    (segment, page, topic_threads, page_date, next_stamp) on the pages queue as each page is read.
+    A final (segment, None, None, None, None) is always put once the walk is over.
+
+    cached_pages maps the t= stamp of each page in the cache to the stamp of the page it links to,
+    pages in it are skipped for as long as the chain of links through the cache is unbroken.
+    The walk is abandoned once stop_walking is set.
+    """
+    next_page = first_page
+    # t= stamps are zero padded YYYYMMDDHHMMSS, so they can be compared as plain ints
+    cutoff_timestamp = int(cutoff_date.strftime("%Y%m%d%H%M%S"))
+    page_retries = 0
+
+    try:
+        while next_page and not stop_walking.is_set():
             #console.print(f"[bold blue]Fetching page:[/bold blue] {next_page}")
 
             try:
-                soup = get_page(next_page)
+                index_page = get_page(next_page)
+                topic_threads = list(extract_topic_threads(index_page))
+                page_retries = 0
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 503:
-                    console.print(f"[yellow]503 Service Unavailable: Retrying after delay...[/yellow]")
-                    time.sleep(read_http_sleep)  # Wait for nn seconds before retrying
+                if e.response.status_code in RETRY_STATUSES and page_retries < b4_retry_count:
+                    wait_time = get_backoff_delay(page_retries, e.response.headers)
+                    console.print(f"[yellow]{e.response.status_code} from server: Retrying after {wait_time:.0f} seconds...[/yellow]")
+                    rate_limiter.pause(wait_time)
+                    page_retries += 1
                     continue
+                console.print(f"[red]Error fetching page: {next_page}[/red]")
+                console.print(f"[red]{e}[/red]")
+                break
             except Exception as e:
                 console.print(f"[red]Error fetching page: {next_page}[/red]")
                 console.print(f"[red]{e}[/red]")
                 break
 
-            topic_threads = extract_topic_threads(soup)
             #console.print(f"[green]Found {len(topic_threads)} topic threads on page.[/green]")
-            cacheFileNeedsUpdate = False
-            for thread_info in topic_threads:
-                # keep track of all topics
-                if thread_info[0] not in cachedTopics:
-                    cachedTopics[thread_info[0]] = 1
-                    thread_data.append(thread_info)
-                    cacheFileNeedsUpdate = True
-                else:
-                    pass  # ignore duplicates - they will be older
-            
-            if cacheFileName and cacheFileNeedsUpdate and not next_page == base_url:
-                # don't cache it if it is the base URL, so we can always get the latest
-                # if don't specify a start
-                cache.append((next_page, topic_threads))  
-                data_to_json_file(cacheFileName, cache)
-
-            next_link = soup.select_one('a[rel="next"]')
+            page = next_page
+            page_date = None
+            next_stamp = 0  # no link to an older page
+
+            next_link = index_page.next_page
             if next_link:
-                next_page = next_link['href']
+                next_page = next_link
                 if not next_page.startswith("http"):
                     next_page = base_url.rstrip('/') + '/' + next_page.lstrip('/')
                 
@@ -261,123 +561,173 @@ def fetch_all_threads(base_url, start_date, end_date,cacheFileName):
                 if "t=" in next_page:
                     timestamp = next_page.split("t=")[-1]
                     try:
-                        page_date = datetime.strptime(timestamp, "%Y%m%d%H%M%S")
-                        if checkForCachedData and int(timestamp) < newestCachedPage:
-                            # so the timestamp on t= is older than the youngest cached page
-                            # so lets just skip to the oldest cached page, and continue
-                            checkForCachedData = False
-                            oldest_timestamp = str(oldestCachedPage)
-                            page_date = datetime.strptime(oldest_timestamp, "%Y%m%d%H%M%S")
-                            next_page = next_page.split("t=")[0] + "t=" + oldest_timestamp
-                        
-                        # Update progress
-                        elapsed_time = (start_date - page_date).total_seconds()
-                        progress_percentage = min(100, max(0, (elapsed_time / total_time_range) * 100))
-                        progress.update(progress_task, completed=progress_percentage)
-
-                        if page_date < cutoff_date:
-                            console.print(f"[yellow]Reached start date: {page_date}[/yellow]")
-                            return thread_data
+                        page_date = parse_timestamp(timestamp)
+                        page_timestamp = next_stamp = int(timestamp)
+
+                        # pages already in the cache don't need fetching again, follow their links through
+                        # the cache to the first page that isn't in it.  Only a page cached together with its
+                        # link can be skipped, so a walk that stopped part way on an earlier run leaves no gap.
+                        skip_to = page_timestamp
+                        while cached_pages.get(skip_to, 0) and cached_pages[skip_to] < skip_to and skip_to >= cutoff_timestamp:
+                            skip_to = cached_pages[skip_to]
+                        if skip_to != page_timestamp:
+                            skip_timestamp = str(skip_to)
+                            page_date = parse_timestamp(skip_timestamp)
+                            page_timestamp = skip_to
+                            next_page = next_page.split("t=")[0] + "t=" + skip_timestamp
+
+                        if page_timestamp < cutoff_timestamp:
+                            next_page = None
                     
                     except ValueError:
                         console.print(f"[red]Invalid timestamp in next_link: {timestamp}[/red]")
-                        break
+                        next_page = None
             else:
                 next_page = None
 
-        console.print(f"[green]Found {len(thread_data)} threads to process.[/green]")
-        return thread_data
+            pages.put((segment, page, topic_threads, page_date, next_stamp))
+    finally:
+        pages.put((segment, None, None, None, None))
 
 
-def fetch_and_parse_threads(base_url, start_date, oldest_date, output_dir,cacheFileName):
-    """Fetch and parse all threads from the base URL until the specified oldest year."""
-   # Convert date strings to datetime objects
+def fetch_all_threads(base_url, start_date, end_date,cacheFileName):
+    """Fetch all threads from a base URL back to end_date, starting at start_date (datetime, or None for now)."""
     if start_date:
-        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
+        start_date_str = start_date.strftime("%Y%m%d%H%M%S")
+        next_page = base_url.rstrip('/') + '/?t=' + start_date_str
     else:
-        start_date_obj = datetime.now()  # Default to current date
+        start_date = datetime.now()  # only used for progress bar
+        next_page = base_url
+        
+    oldest_date = end_date
+    total_time_range = (start_date - oldest_date).total_seconds()
 
-    oldest_date_obj = datetime.strptime(oldest_date, "%Y-%m-%d")
+    thread_data = []  # Use a list instead of a set
+    cached_pages = {}  # t= stamp of a cached page -> t= stamp of the page it links to
+    cachedTopics = set()
+
+    for page, topic_threads, next_stamp in read_cache_file(cacheFileName):  # Only process topic_threads from the cache
+        for thread_info in topic_threads:
+            url = sys.intern(thread_info[0])
+            if url not in cachedTopics:
+                cachedTopics.add(url)
+                thread_data.append(thread_info)
+            else:
+                pass  # ignore duplicates - they will be older
 
-    # Validate that start_date is older than oldest_date
-    if start_date_obj <= oldest_date_obj:
+        timestamp = page.split("t=")[-1]
+        try:
+            if next_stamp is not None:
+                cached_pages[int(timestamp)] = next_stamp
+        except ValueError:
+            continue
+
+    # The index can only be walked one page at a time, as each page links to the next.
+    # So split the date range up and walk each part of it at the same time, newest first.
+    # Each walker stops once it is past the start of its segment, the overlap is
+    # taken care of by cachedTopics.
+    walkers = max(1, min(index_page_walkers, (start_date - oldest_date).days))
+    segment_length = (start_date - oldest_date) / walkers
+    segment_starts = [start_date - segment_length * segment for segment in range(walkers)]
+    segment_ends = segment_starts[1:] + [oldest_date]
+    segment_progress = [0.0] * walkers
+    pages = queue.Queue()
+    stop_walking = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=walkers)
+
+    # Add progress tracking, the cache file is only ever appended to while fetching
+    with Progress() as progress, (open(cacheFileName, "at", encoding="utf-8") if cacheFileName else nullcontext()) as cache_fp:
+        progress_task = progress.add_task(f"[cyan]Fetching threads from {base_url}..", total=100)
+
+        try:
+            for segment in range(walkers):
+                first_page = next_page if segment == 0 else base_url.rstrip('/') + '/?t=' + segment_starts[segment].strftime("%Y%m%d%H%M%S")
+                executor.submit(walk_index, base_url, segment, first_page, segment_ends[segment],
+                                cached_pages, pages, stop_walking)
+
+            walking = walkers
+            while walking:
+                segment, page, topic_threads, page_date, next_stamp = pages.get()
+                if page is None:
+                    walking -= 1
+                    continue
+
+                for thread_info in topic_threads:
+                    # keep track of all topics
+                    url = thread_info[0]
+                    if url not in cachedTopics:
+                        cachedTopics.add(url)
+                        thread_data.append(thread_info)
+                    else:
+                        pass  # ignore duplicates - they will be older
+
+                # every page is cached, even one without new topics, so the next run can follow the links
+                # through it.  compact_cache_file drops the older entry when a page is cached again.
+                if cache_fp and not page == base_url:
+                    # don't cache it if it is the base URL, so we can always get the latest
+                    # if don't specify a start
+                    append_cache_entry(cache_fp, page, topic_threads, next_stamp)
+
+                if page_date:
+                    # Update progress
+                    elapsed_time = (segment_starts[segment] - max(page_date, segment_ends[segment])).total_seconds()
+                    segment_progress[segment] = max(0, elapsed_time)
+                    progress_percentage = min(100, max(0, (sum(segment_progress) / total_time_range) * 100))
+                    progress.update(progress_task, completed=progress_percentage)
+        finally:
+            # on Ctrl-C (or anything else going wrong) don't wait for the walkers to finish their segments
+            stop_walking.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        console.print(f"[green]Found {len(thread_data)} threads to process.[/green]")
+        return thread_data
+
+
+def fetch_and_parse_threads(base_url, start_date, oldest_date, output_dir,cacheFileName):
+    """Fetch and parse all threads from the base URL back to oldest_date; both dates are datetimes, start_date may be None for now."""
+    # Validate that start_date is newer than oldest_date
+    if (start_date or datetime.now()) <= oldest_date:
         raise ValueError(f"start_date ({start_date}) must be newer than oldest_date ({oldest_date}).")
     
     
     os.makedirs(output_dir, exist_ok=True)
+    load_completed_index(output_dir)
     thread_data = fetch_all_threads(base_url, start_date, oldest_date,cacheFileName)
-    all_threads = []
+    if cacheFileName:
+        compact_cache_file(cacheFileName)
+
+    # anything in the completed index is already on disk from an earlier run, so don't schedule it at all
+    pending_threads = [thread for thread in thread_data if thread[0] not in completed_threads]
+    if len(pending_threads) < len(thread_data):
+        print(f"{len(thread_data) - len(pending_threads)} threads already downloaded.")
+    thread_data = pending_threads
 
-    def process_thread(thread):
-        thread_url, thread_title, base_url = thread
-        #return fetch_thread_with_b4(thread_url, base_url, thread_title, output_dir)
-        retVal = download_mbx_thread(thread_url, base_url, thread_title, output_dir)
-        
-        return retVal, thread
-    
     total_threads = len(thread_data)
-    processed_threads = 0
     print(f"Writing files to {output_dir}")
-    
-    threadsWithErrors = []
-    
+
     with Progress() as progress:
         task = progress.add_task(f"[blue]Fetching MBX files for {total_threads} threads...", total=total_threads)
+        threadsWithErrors = asyncio.run(fetch_mbx_files(thread_data, base_url, output_dir, b4_thread_count, progress, task))
 
-        # this can be run with multiple threads, and it is a bit faster
-        # however a lot of 503 error will occur (depending on the time of day it seems)
-        # so if we run single thread is slower, but does not seem to get the errors
-        if False:
-            workers = b4_thread_count
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                for thread_dir, threadInfo in executor.map(process_thread, ((thread[0], thread[1], base_url) for thread in thread_data)):
-                    processed_threads += 1
-                    progress.update(task, advance=1)  # Increment the progress bar
-                    if not thread_dir:
-                        threadsWithErrors.append(threadInfo)
-
-        else:                    
-            for thread in thread_data:
-                thread_dir, threadInfo = process_thread((thread[0], thread[1], base_url))
-                processed_threads += 1
-                progress.update(task, advance=1)  # Increment the progress bar
-                if not thread_dir:
-                    threadsWithErrors.append(threadInfo)
-                    
-                    
     # even with the retries and timeouts, still get a lot of 503 errors
-    # especially during the day, so go through, with a single thread this time
+    # especially during the day, so go through, one at a time this time
     # and try a few more times.
-    if threadsWithErrors:
-        repeatCount=3
-        withErrors=[]
-        while threadsWithErrors and repeatCount:
-            print(f"{len(threadsWithErrors)} errors found while fetching {total_threads} .MBX files.  Trying once again.")
-            for threadInfo in threadsWithErrors:
-                if not process_thread(threadInfo):
-                    withErrors.append(threadInfo)
-                    
-            threadsWithErrors = withErrors    
-            repeatCount -= 1
-
-
-def display_threads(threads):
-    """Display threads using rich."""
-    for thread in threads:
-        console.print(f"[bold green]Thread URL:[/bold green] {thread['url']}")
+    repeatCount=3
+    while threadsWithErrors and repeatCount:
+        print(f"{len(threadsWithErrors)} errors found while fetching {total_threads} .MBX files.  Trying once again.")
+        threadsWithErrors = asyncio.run(fetch_mbx_files(threadsWithErrors, base_url, output_dir, 1))
+        repeatCount -= 1
 
-        table = Table(title="Thread Details")
-        table.add_column("Content", style="cyan")
 
-        for email in thread["emails"]:
-            table.add_row(email["content"][:30] + "..." if len(email["content"]) > 30 else email["content"])
+def parse_date(date_str):
+    """Parse a YYYY-MM-DD date from the command line."""
+    return datetime.strptime(date_str, "%Y-%m-%d")
 
-        console.print(table)
 
 if __name__ == "__main__":
     from argparse import ArgumentParser
 
-    parser = ArgumentParser(description=f"Fetch and locally threads from lore.kernel.org using b4. v{__version__}")
+    parser = ArgumentParser(description=f"Fetch and locally store threads from lore.kernel.org. v{__version__}")
     subparsers = parser.add_subparsers(dest="mode", required=True)
 
     fetch_parser = subparsers.add_parser("fetch-patches", help="Fetch patches from the specified base URL.")
@@ -389,11 +739,13 @@ if __name__ == "__main__":
     fetch_parser.add_argument(
         "--start-date",
         required=False,
+        type=parse_date,
         help="Start from a specific date. e.g.,  e.g., 2024-12-01. Default is to start from now",
     )
     fetch_parser.add_argument(
         "--end-date",
         required=True,
+        type=parse_date,
         help="Oldest date to fetch threads for, e.g., 2024-12-02.",
     )
     fetch_parser.add_argument(
@@ -425,9 +777,10 @@ if __name__ == "__main__":
             cacheFileName = None
         else:
             sanitized_base_url = args.base_url.replace("https://", "").replace("/", "_").strip("_")
-            cacheFileName = f"{sanitized_base_url}_cache.json"
+            cacheFileName = f"{sanitized_base_url}_cache.jsonl"
+            migrate_cache_file(f"{sanitized_base_url}_cache.json", cacheFileName)
         console.print("[bold blue]Fetching patches...[/bold blue]")
-        fetch_and_parse_threads(args.base_url, args.end_date, args.start_date, args.output_dir, cacheFileName)
+        fetch_and_parse_threads(args.base_url, args.start_date, args.end_date, args.output_dir, cacheFileName)
 
     elif args.mode == "analyze":
         console.print("[bold blue]Not implemented yet[/bold blue]")
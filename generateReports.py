@@ -5,6 +5,8 @@ from rich import print
 from datetime import timedelta
 import pandas as pd
 from collections import Counter
+import heapq
+import functools
 import datetime
 from data_store import (
     thread_initiators, 
@@ -14,9 +16,23 @@ from data_store import (
     patches_df,
     name_to_emails,     
     email_to_name,
-    get_patches  
+    email_domain,
+    get_patches,
+    get_data_version
 )
 
+
+@functools.lru_cache(maxsize=4)
+def count_domains(source, data_version):
+    """
+    Count the email domains of the thread 'initiators' or 'responders'.
+
+    Cached per data_version, so reports run again over the same data don't recount.
+    """
+    authors = thread_initiators if source == "initiators" else thread_responders
+    return Counter(email_domain[email] for author in authors
+                   for email in name_to_emails.get(author, ()) if email in email_domain)
+
 class ReportGenerator:
     def __init__(self, top_count=10):
         """
@@ -46,8 +62,8 @@ class ReportGenerator:
         table.add_column("Author", style="dim", width=40)
         table.add_column("Threads Initiated", justify="right")
 
-        sorted_initiators = sorted(thread_initiators.items(), key=lambda x: x[1], reverse=True)
-        for author, count in sorted_initiators[:self.top_count]:
+        top_initiators = heapq.nlargest(self.top_count, thread_initiators.items(), key=lambda x: x[1])
+        for author, count in top_initiators:
             table.add_row(author, str(count))
         self.console.print(table)
 
@@ -58,9 +74,10 @@ class ReportGenerator:
         table.add_column("Author", style="dim", width=40)
         table.add_column("Threads Responded To", justify="right")
 
-        sorted_responders = sorted(thread_responders.items(), key=lambda x: len(x[1]), reverse=True)
-        for author, threads in sorted_responders[:self.top_count]:
-            table.add_row(author, str(len(threads)))
+        responder_counts = [(author, len(threads)) for author, threads in thread_responders.items()]
+        top_responders = heapq.nlargest(self.top_count, responder_counts, key=lambda x: x[1])
+        for author, count in top_responders:
+            table.add_row(author, str(count))
         self.console.print(table)
 
     def print_avg_responses(self):
@@ -104,40 +121,16 @@ class ReportGenerator:
 
     def print_top_author_domains(self, top_n=10):
         """Print the top email domains among authors."""
-        self.console.print("\n[bold green]Top Email Domains for Authors:[/bold green]")
-        domain_counter = Counter()
-
-        for author in thread_initiators:
-            emails = name_to_emails.get(author, [])
-            for email in emails:
-                domain = self.extract_domain(email)
-                if domain:
-                    domain_counter[domain] += 1
-
-        top_domains = domain_counter.most_common(top_n)
-
-        table = Table(show_header=True, header_style="bold blue")
-        table.add_column("Domain", style="dim", width=40)
-        table.add_column("Count", justify="right")
-
-        for domain, count in top_domains:
-            table.add_row(domain, str(count))
-
-        self.console.print(table)
+        self.print_domain_table("Authors", "initiators", top_n)
 
     def print_top_responder_domains(self, top_n=10):
         """Print the top email domains among responders."""
-        self.console.print("\n[bold green]Top Email Domains for Responders:[/bold green]")
-        domain_counter = Counter()
+        self.print_domain_table("Responders", "responders", top_n)
 
-        for responder in thread_responders:
-            emails = name_to_emails.get(responder, [])
-            for email in emails:
-                domain = self.extract_domain(email)
-                if domain:
-                    domain_counter[domain] += 1
-
-        top_domains = domain_counter.most_common(top_n)
+    def print_domain_table(self, label, source, top_n):
+        """Print the top_n email domains counted by count_domains for the given source."""
+        self.console.print(f"\n[bold green]Top Email Domains for {label}:[/bold green]")
+        top_domains = count_domains(source, get_data_version()).most_common(top_n)
 
         table = Table(show_header=True, header_style="bold blue")
         table.add_column("Domain", style="dim", width=40)
@@ -148,22 +141,6 @@ class ReportGenerator:
 
         self.console.print(table)
 
-    @staticmethod
-    def extract_domain(email):
-        """
-        Extract the domain from an email address.
-
-        Args:
-            email (str): The email address.
-
-        Returns:
-            str: The domain part of the email, or None if invalid.
-        """
-        try:
-            return email.split('@')[1].lower()
-        except (IndexError, AttributeError):
-            return None
-
     def generate_all_reports(self):
         """Generate all reports."""
         self.print_date_range()
@@ -2,22 +2,58 @@ import os
 import re
 import time
 import argparse
+import heapq
+import functools
 import pandas as pd
+from pandas.api.types import union_categoricals
+from concurrent.futures import ProcessPoolExecutor
 from rich import print
 from rich.progress import Progress, BarColumn, TimeRemainingColumn
 from rich.table import Table
 from rich.console import Console
-from collections import defaultdict
+from collections import defaultdict, Counter
 from datetime import datetime
 from dateutil import parser
+from email.utils import parsedate_to_datetime
 from datetime import timedelta, timezone
 
 from data_store import thread_initiators, thread_responders, thread_response_counts, thread_times, patches_df
-from data_store import name_to_emails, email_to_name, set_patches
+from data_store import name_to_emails, email_to_name, email_domain, set_patches
 from generateReports import ReportGenerator
 
-patches_data = []
-patches_data_buffer = []
+# Columns of the patches DataFrame, buffered as one list per column until finalize_patches_data
+patches_columns = ["From", "To", "Date", "Subject", "ReviewedBy", "Timestamp", "Initiator", "IsReply"]
+patches_data_buffer = {column: [] for column in patches_columns}
+category_columns = ["From", "To", "Subject", "ReviewedBy"]
+
+# Every patches_flush_rows buffered rows are packed into a DataFrame chunk, so the Python
+# objects for all rows of all emails never have to be held at once
+patches_flush_rows = 100000
+patches_chunks = []
+
+# (name, email) pairs from every file, merged into the name/email maps in one go by finalize_patches_data
+name_pairs_buffer = []
+
+# Worker processes used to parse the .mbx files (None = one per CPU), and how many files each is handed at once
+parse_workers = None
+parse_chunksize = 16
+
+# Date header cleanup done by parse_date, compiled once
+_WS_RE = re.compile(r'\s+')
+_ENC_RE = re.compile(r'=\S+')
+_PAREN_RE = re.compile(r'\(.*?\)')
+_LEAD_RE = re.compile(r'^[^\w]+')
+_TRAIL_RE = re.compile(r'[^\w]+$')
+
+# Bots whose emails parse_emails_from_mbx leaves out
+_SKIP_RE = re.compile(r'syzbot|patchwork-bot')
+
+# The only lines parse_emails_from_mbx acts on, everything else (mostly diffs) is skipped over in C.
+# Anchored on the newline rather than ^ so the regex engine can scan for it directly.
+# A line takes its folded continuation lines (those starting with whitespace) along with it.
+_MBOX_LINE_RE = re.compile(r'\n((From mboxrd@z|Subject:|From:|To:|Date:|Reviewed-by:)[^\n]*(?:\n[ \t][^\n]*)*)')
+# RFC 2822 unfolding, collapsing the whitespace around each fold to a single space
+_UNFOLD_RE = re.compile(r'[ \t]*\r?\n[ \t]+')
 
 def print_metrics(top_count=10):
     """Generate and print reports."""
@@ -53,7 +89,7 @@ def generate_reviewer_author_table(top_n=10):
     console = Console()
 
     # Sort authors by the number of threads they initiated
-    top_authors = sorted(thread_initiators.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    top_authors = heapq.nlargest(top_n, thread_initiators.items(), key=lambda x: x[1])
 
     if not top_authors:
         console.print("[bold red]No authors found in thread_initiators![/bold red]")
@@ -64,21 +100,22 @@ def generate_reviewer_author_table(top_n=10):
     table.add_column("Author", style="dim", width=40)
     table.add_column("Top Reviewers (with count)", justify="left", width=70)
 
+    # Invert thread_responders once, so each thread's responders are a lookup rather than a scan
+    thread_to_responders = defaultdict(set)
+    for responder, responded_threads in thread_responders.items():
+        for thread_id in responded_threads:
+            thread_to_responders[thread_id].add(responder)
+
     for author, _ in top_authors:
         # Collect reviewers for the author's threads
-        reviewers = []
-        threads = thread_responders.get(author, set())
-        for thread_id in threads:
-            for responder, responded_threads in thread_responders.items():
-                if thread_id in responded_threads and responder != author:
-                    reviewers.append(responder)
+        reviewers = [responder for thread_id in thread_responders.get(author, ())
+                     for responder in thread_to_responders[thread_id] if responder != author]
 
-        # Count and sort reviewers by frequency
-        reviewer_counts = {r: reviewers.count(r) for r in set(reviewers)}
-        sorted_reviewers = sorted(reviewer_counts.items(), key=lambda x: x[1], reverse=True)
+        # Count reviewers and keep the 5 most frequent
+        sorted_reviewers = Counter(reviewers).most_common(5)
 
         # Format top reviewers for the table
-        top_reviewers = ", ".join([f"{reviewer} ({count})" for reviewer, count in sorted_reviewers[:5]])
+        top_reviewers = ", ".join([f"{reviewer} ({count})" for reviewer, count in sorted_reviewers])
 
         # Add row to the table
         table.add_row(author, top_reviewers or "No reviewers")
@@ -97,86 +134,126 @@ def parse_emails_from_mbx(file_path):
         file_path (str): Path to the .mbx file.
 
     Returns:
-        List[Dict[str, Any]]: A list of dictionaries, each containing email metadata.
+        Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]: A list of dictionaries, each containing email
+        metadata, and the (name, email) pairs seen in the file for record_names.
     """
     emails = []
+    name_pairs = []
     current_email = None
-    skipList = ["syzbot", "patchwork-bot"]
 
     try:
+        # Read the whole file in one go and only visit the lines of interest, rather than
+        # stepping through every line of every patch in Python
         with open(file_path, "r", encoding="utf-8", errors="replace") as file:
-            for line in file:
-                if line.startswith("From mboxrd@z"):
-                    # Start a new email if a "From:" line is encountered
-                    if current_email:
-                        if not any(skip_item in current_email["From"][0] for skip_item in skipList):
-                            emails.append(current_email)
-
-                    current_email = {
-                        "From": (None, None),
-                        "To": "",
-                        "Date": "",
-                        "Subject": "",
-                        "ReviewedBy": [],
-                        # "Body": "",
-                    }
-
-                elif line.startswith("Subject:") and current_email and not current_email["Subject"]:
-                    subject_lines = [extract_field(line, "Subject")[0]]
-                    while True:
-                        next_line = next(file).strip()
-                        if not next_line :
-                            break
-                        if next_line.startswith(("From:", "To:", "Date:", "Reviewed-by:")):                        
-                            break
-                        subject_lines.append(next_line)
-                    current_email["Subject"] = " ".join(subject_lines)
-                    if next_line:
-                        line = next_line
-                    
-
-                if line.startswith("From:") and current_email and not current_email["From"][0]:
-                    name, email = extract_field(line, "From")
-                    current_email["From"] = (name, email)
-                    if name:
-                        if email:
-                            name_to_emails[name].add(email)
-                            email_to_name[email] = name
-                        else:
-                            # Handle cases where email might be missing
-                            name_to_emails[name].add("unknown@example.com")  # Placeholder or handle appropriately
-
-                elif line.startswith("To:") and current_email and not current_email["To"]:
-                    name, email = extract_field(line, "To")
-                    if name:
-                        if email:
-                            name_to_emails[name].add(email)
-                            email_to_name[email] = name
-                        current_email["To"] = name  # Store only the name for analysis
-
-                if line.startswith("Date:") and current_email and not current_email["Date"]:
-                    current_email["Date"] = extract_field(line, "Date")[0]  # Date remains as string
-                    
-                elif line.startswith("Reviewed-by:") and current_email:
-                    name, email = extract_field(line, "Reviewed-by")
-                    if name:
-                        if email:
-                            name_to_emails[name].add(email)
-                            email_to_name[email] = name
-                        current_email["ReviewedBy"].append(name)  # Store only the name for analysis
-
-                # Handle other fields if necessary
-
-            # Append the last email if it exists
-            if current_email:
-                if not any(skip_item in current_email["From"][0] for skip_item in skipList):
+            text = "\n" + file.read()  # so the first line starts after a newline too
+
+        # Globals used for every header line, bound to locals for the loop
+        handlers = _FIELD_HANDLERS
+        skip_search = _SKIP_RE.search
+
+        for match in _MBOX_LINE_RE.finditer(text):
+            line, prefix = match.group(1, 2)
+            if "\n" in line:
+                line = _UNFOLD_RE.sub(" ", line)
+
+            if prefix == "From mboxrd@z":
+                # Start a new email if a "From:" line is encountered
+                if current_email and not skip_search(current_email["From"][0] or ""):
                     emails.append(current_email)
 
+                current_email = {
+                    "From": (None, None),
+                    "To": "",
+                    "Date": "",
+                    "Subject": "",
+                    "ReviewedBy": [],
+                    # "Body": "",
+                }
+                continue
+
+            if not current_email:
+                continue
+
+            if prefix == "Subject:":
+                if not current_email["Subject"]:
+                    current_email["Subject"] = extract_field(line, "Subject")[0]
+                continue
+
+            handlers[prefix](current_email, line, name_pairs)
+
+            # Handle other fields if necessary
+
+        # Append the last email if it exists
+        if current_email and not _SKIP_RE.search(current_email["From"][0] or ""):
+            emails.append(current_email)
+
 
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
 
-    return emails
+    return emails, name_pairs
+
+
+def handle_from(current_email, line, name_pairs):
+    """Record the sender of the email, only the first From: line counts."""
+    if not current_email["From"][0]:
+        name, email = extract_field(line, "From")
+        current_email["From"] = (name, email)
+        if name:
+            name_pairs.append((name, email))
+
+def handle_to(current_email, line, name_pairs):
+    """Record the name of the first recipient."""
+    if not current_email["To"]:
+        name, email = extract_field(line, "To")
+        if name:
+            if email:
+                name_pairs.append((name, email))
+            current_email["To"] = name  # Store only the name for analysis
+
+def handle_date(current_email, line, name_pairs):
+    """Record the first Date: line of the email."""
+    if not current_email["Date"]:
+        current_email["Date"] = extract_field(line, "Date")[0]  # Date remains as string
+
+def handle_reviewed_by(current_email, line, name_pairs):
+    """Add a reviewer to the email."""
+    name, email = extract_field(line, "Reviewed-by")
+    if name:
+        if email:
+            name_pairs.append((name, email))
+        current_email["ReviewedBy"].append(name)  # Store only the name for analysis
+
+# Header line prefix -> handler, so each line does a single lookup instead of a run of startswith checks
+_FIELD_HANDLERS = {
+    "From:": handle_from,
+    "To:": handle_to,
+    "Date:": handle_date,
+    "Reviewed-by:": handle_reviewed_by,
+}
+
+
+def record_names(name_pairs):
+    """
+    Merges the (name, email) pairs returned by parse_emails_from_mbx into the name/email maps.
+
+    Args:
+        name_pairs: Iterable of (name, email) tuples, email is None when the From line had no address.
+    """
+    for name, email in name_pairs:
+        if email:
+            name_to_emails[name].add(email)
+            email_to_name[email] = name
+        else:
+            # Handle cases where email might be missing
+            email = "unknown@example.com"  # Placeholder or handle appropriately
+            name_to_emails[name].add(email)
+
+        # split each address once, here, rather than in every domain report
+        if email not in email_domain:
+            parts = email.split('@')
+            if len(parts) > 1 and parts[1]:
+                email_domain[email] = parts[1].lower()
 
 
 
@@ -192,15 +269,15 @@ def extract_field(line, field_name):
         tuple: (name, email) if found, else (None, None).
     """
     line = line.strip()
-    pattern = fr"{field_name}:\s*(.*)"
-    match = re.match(pattern, line)
-    if match:
-        content = match.group(1).strip()
-        # Regex to extract name and email
-        name_email_match = re.match(r'(.*?)\s*<(.+?)>', content)
-        if name_email_match:
-            name = name_email_match.group(1).strip()
-            email = name_email_match.group(2).strip().lower()
+    prefix = f"{field_name}:"
+    if line.startswith(prefix):
+        content = line[len(prefix):].strip()
+        # The email is between the first '<' and the next '>' after at least one character
+        lt = content.find('<')
+        gt = content.find('>', lt + 2) if lt != -1 else -1
+        if gt != -1:
+            name = content[:lt].strip()
+            email = content[lt + 1:gt].strip().lower()
             return name, email
         else:
             # If no email is present, return the whole content as name
@@ -208,51 +285,102 @@ def extract_field(line, field_name):
     return None, None
 
 
+# Define common timezone mappings
+tzinfos = {
+    "CEST": timezone(timedelta(hours=2)),  # Central European Summer Time
+    "CET": timezone(timedelta(hours=1)),   # Central European Time
+    "PST": timezone(timedelta(hours=-8)),  # Pacific Standard Time
+    "PDT": timezone(timedelta(hours=-7)),  # Pacific Daylight Time
+    "GMT": timezone(timedelta(hours=0)),   # Greenwich Mean Time
+}
+
+def clean_date_str(date_str):
+    """
+    Strips a Date header value down to something dateutil can parse.
+
+    Args:
+        date_str (str): The raw date string.
+
+    Returns:
+        str: The cleaned up date string.
+    """
+    # Preprocess the date string
+    if '\t' in date_str:
+        # Split the string at the tab and keep the part before it
+        date_str =  date_str.split('\t')[0]
+        
+    date_str = date_str.strip()
+    
+    date_str = _WS_RE.sub(' ', date_str)  # Collapse multiple spaces
+    date_str = _ENC_RE.sub('', date_str)  # Remove encoded characters
+    date_str = _PAREN_RE.sub('', date_str)  # Remove content in parentheses
+#    date_str = date_str.replace("at ", "").replace("/", "-")
+
+    # Remove invalid leading/trailing characters
+    date_str = _LEAD_RE.sub('', date_str)
+    date_str = _TRAIL_RE.sub('', date_str)
+    return date_str
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_clean_date(date_str):
+    """
+    Parses a cleaned up date string into a UTC timestamp, cached as the same
+    Date header shows up again and again across threads.
+
+    Args:
+        date_str (str): A date string from clean_date_str.
+
+    Returns:
+        int: Seconds since the epoch, raises if the string can't be parsed.
+    """
+    # Attempt to parse the date string
+    parsed_date = parser.parse(date_str, tzinfos=tzinfos)
+
+    # Force the result to be timezone-aware
+    if parsed_date.tzinfo is None:
+        parsed_date = parsed_date.replace(tzinfo=timezone.utc)
+
+    return int(parsed_date.timestamp())
+
+
+# The last Date string parse_date parsed successfully and its timestamp.  Neighbouring emails
+# often carry the very same Date header, which this catches without any hashing.
+_last_parsed_date = (None, None)
+
 def parse_date(date_str, thread_id):
     """
-    Parses a date string into a timezone-aware datetime object.
+    Parses a date string into a timezone-aware timestamp.
 
     Args:
         date_str (str): The date string to parse.
 
     Returns:
-        datetime: A timezone-aware datetime object, or None if parsing fails.
+        int: Seconds since the epoch, or None if parsing fails.
     """
-    # Define common timezone mappings
-    orig_str = date_str
-    tzinfos = {
-        "CEST": timezone(timedelta(hours=2)),  # Central European Summer Time
-        "CET": timezone(timedelta(hours=1)),   # Central European Time
-        "PST": timezone(timedelta(hours=-8)),  # Pacific Standard Time
-        "PDT": timezone(timedelta(hours=-7)),  # Pacific Daylight Time
-        "GMT": timezone(timedelta(hours=0)),   # Greenwich Mean Time
-    }
+    global _last_parsed_date
 
-    try:
-        # Preprocess the date string
-        if '\t' in date_str:
-            # Split the string at the tab and keep the part before it
-            date_str =  date_str.split('\t')[0]
-            
-        date_str = date_str.strip()
-        
-        date_str = re.sub(r'\s+', ' ', date_str)  # Collapse multiple spaces
-        date_str = re.sub(r'=\S+', '', date_str)  # Remove encoded characters
-        date_str = re.sub(r'\(.*?\)', '', date_str)  # Remove content in parentheses
-#        date_str = date_str.replace("at ", "").replace("/", "-")
+    if date_str == _last_parsed_date[0]:
+        return _last_parsed_date[1]
 
-        # Remove invalid leading/trailing characters
-        date_str = re.sub(r'^[^\w]+', '', date_str)
-        date_str = re.sub(r'[^\w]+$', '', date_str)
-
-        # Attempt to parse the date string
-        parsed_date = parser.parse(date_str, tzinfos=tzinfos)
+    orig_str = date_str
 
-        # Force the result to be timezone-aware
-        if parsed_date.tzinfo is None:
-            parsed_date = parsed_date.replace(tzinfo=timezone.utc)
+    # Nearly every Date header is plain RFC 2822, which the email package parses far quicker
+    # than dateutil.  Anything it can't place in a timezone goes through the full cleanup.
+    try:
+        parsed_date = parsedate_to_datetime(date_str)
+        if parsed_date.tzinfo is not None:
+            timestamp = int(parsed_date.timestamp())
+            _last_parsed_date = (orig_str, timestamp)
+            return timestamp
+    except (TypeError, ValueError, IndexError):
+        pass
 
-        return int(parsed_date.timestamp())
+    try:
+        date_str = clean_date_str(date_str)
+        timestamp = parse_clean_date(date_str)
+        _last_parsed_date = (orig_str, timestamp)
+        return timestamp
 
     except Exception as e:
         print(f"Error parsing date for {thread_id}: {date_str} [{orig_str}]. Exception: {e}")
@@ -262,20 +390,17 @@ def parse_date(date_str, thread_id):
 
 def update_patches_data(emails, file_path):
     """
-    Updates thread data and metrics based on email data.
+    Buffers one row per email, column by column; the thread metrics are aggregated from these rows in finalize_patches_data.
 
     Args:
         emails: List of email data dictionaries, where the first email is the thread initiator.
     """
-    global patches_df, thread_initiators, thread_responders, thread_response_counts, thread_times
-
     if not emails:
         return
 
     # Extract the thread initiator
     initiator_email = emails[0]
     thread_author_name = initiator_email.get("From", (None, None))[0]
-    thread_author_email = initiator_email.get("From", (None, None))[1]
 
     if not thread_author_name:
         thread_author_name = "Unknown Author"
@@ -287,62 +412,113 @@ def update_patches_data(emails, file_path):
         print(f"Warning: Missing thread ID for file {file_path}")
         return
 
-    thread_start_date = parse_date(initiator_email.get("Date", ""), file_path)
-    # Track the thread initiator by name
-    thread_initiators[thread_author_name] += 1
-
-    # Initialize thread timing
-    thread_times.setdefault(thread_id, [thread_start_date, thread_start_date])  # [start_time, last_response_time]
-
-    # Update thread timing with a valid start date
-    if thread_start_date:
-        thread_times[thread_id][0] = thread_start_date
+    buf = patches_data_buffer
+    timestamps = {}  # Date string -> parsed timestamp, replies often repeat a Date already seen in the thread
 
     # Process all emails in the thread
     for idx, email in enumerate(emails):
         author_name = email.get("From", (None, None))[0]
-        author_email = email.get("From", (None, None))[1]
-        date = parse_date(email.get("Date", ""), file_path)
-        if not date:
-            date = thread_start_date
         reviewers = email.get("ReviewedBy", [])
 
         if not author_name:
             author_name = "Unknown Author"
 
-        # Update thread timing with the most recent response
-        if date:
-            try:
-                thread_times[thread_id][1] = max(thread_times[thread_id][1], date)
-            except TypeError:
-                print(f"Invalid date comparison in thread '{thread_id}': {thread_times[thread_id][1]} vs {date}")
-                continue
+        date_str = email.get("Date", "")
+        timestamp = timestamps.get(date_str)
+        if timestamp is None:  # failures are parsed again, so each one is still reported
+            timestamp = timestamps[date_str] = parse_date(date_str, file_path)
 
-        # Increment response count for the thread (excluding the initiator responding to their own thread)
-        if idx > 0 and author_name != thread_author_name:
-            thread_response_counts[thread_id] += 1
-            thread_responders[author_name].add(thread_id)
+        buf["From"].append(author_name)  # Use name instead of email
+        buf["To"].append(email.get("To", ""))  # Assuming 'To' is now a name
+        buf["Date"].append(date_str)
+        buf["Subject"].append(thread_id)  # Use thread ID for consistency
+        buf["ReviewedBy"].append(reviewers)  # Joined into a single string in finalize_patches_data
+        buf["Timestamp"].append(timestamp)
+        buf["Initiator"].append(thread_author_name)
+        buf["IsReply"].append(idx > 0)
 
-        # Update the global DataFrame for reporting
-        row = {
-            "From": author_name,  # Use name instead of email
-            "To": email.get("To", ""),  # Assuming 'To' is now a name
-            "Date": email.get("Date", ""),
-            "Subject": thread_id,  # Use thread ID for consistency
-            "ReviewedBy": ", ".join(reviewers),  # Join list of reviewers as a single string
-            # "Body": email.get("Body", "").strip(),  # Strip trailing newlines or spaces
-        }
+    if len(buf["From"]) >= patches_flush_rows:
+        flush_patches_buffer()
 
-        patches_data_buffer.append(row)
-    # patches_df = pd.concat([patches_df, pd.DataFrame([row])], ignore_index=True)
 
+# Columns only used to aggregate the thread metrics, dropped before the DataFrame is published
+metric_columns = ["Timestamp", "Initiator", "IsReply"]
+
+def to_timestamp(value):
+    """Convert an aggregated timestamp back to an int, or None if it is missing."""
+    return None if pd.isna(value) else int(value)
+
+def aggregate_thread_metrics(df):
+    """
+    Fills the thread metric dicts in data_store from the per-email rows using group-bys.
+
+    Args:
+        df: DataFrame built from the buffered rows, including the metric columns.
+    """
+    timestamps = df["Timestamp"].astype("float64")
+    initiators = df[~df["IsReply"]]
+
+    for author, count in initiators.groupby("From", sort=False, observed=True).size().items():
+        thread_initiators[author] += int(count)
+
+    # Start is the initiator date of the last file carrying that subject, end is the newest email
+    starts = timestamps[~df["IsReply"]].groupby(initiators["Subject"], sort=False, observed=True).last()
+    ends = timestamps.groupby(df["Subject"], sort=False, observed=True).max()
+    for thread_id, end in ends.items():
+        thread_times[thread_id] = [to_timestamp(starts.get(thread_id)), to_timestamp(end)]
+
+    # Responses exclude the initiator responding to their own thread
+    replies = df[df["IsReply"] & (df["From"] != df["Initiator"])]
+    for thread_id, count in replies.groupby("Subject", sort=False, observed=True).size().items():
+        thread_response_counts[thread_id] += int(count)
+    for author, threads in replies.groupby("From", sort=False, observed=True)["Subject"].unique().items():
+        thread_responders[author].update(threads)
+
+
+def flush_patches_buffer():
+    """
+    Packs the buffered rows into a DataFrame chunk, with the repetitive columns stored as
+    categories, and starts a new buffer.
+    """
+    global patches_data_buffer
+
+    if not patches_data_buffer["From"]:
+        return
+
+    # Built straight from the column lists, no per-row dicts for pandas to transpose
+    chunk = pd.DataFrame(patches_data_buffer, copy=False)
+    # Join each list of reviewers as a single string, in one pass over the column
+    chunk["ReviewedBy"] = chunk["ReviewedBy"].map(", ".join)
+    # Names and subjects repeat across many rows, categories store them once and group on integer codes
+    for column in category_columns:
+        chunk[column] = chunk[column].astype("category")
+    patches_chunks.append(chunk)
+    patches_data_buffer = {column: [] for column in patches_columns}  # Clear the buffer
 
 def finalize_patches_data():
-    global patches_df, patches_data_buffer
-    
-    patches_df = pd.DataFrame(patches_data_buffer)
+    global patches_df
+
+    # The same pairs repeat endlessly, so merge each one once.  Deduplicated on its last
+    # occurrence, so email_to_name still ends up with the last name seen for an address.
+    record_names(reversed(dict.fromkeys(reversed(name_pairs_buffer))))
+    name_pairs_buffer.clear()
+
+    flush_patches_buffer()
+    if patches_chunks:
+        if len(patches_chunks) > 1:
+            # Give every chunk the same categories, so concat keeps the columns categorical
+            for column in category_columns:
+                categories = union_categoricals([chunk[column] for chunk in patches_chunks]).categories
+                for chunk in patches_chunks:
+                    chunk[column] = chunk[column].cat.set_categories(categories)
+        patches_df = pd.concat(patches_chunks, ignore_index=True)
+        patches_chunks.clear()
+    else:
+        patches_df = pd.DataFrame()
+    if not patches_df.empty:
+        aggregate_thread_metrics(patches_df)
+        patches_df = patches_df.drop(columns=metric_columns)
     set_patches(patches_df)
-    patches_data_buffer = []  # Clear the buffer
 
 def process_file(file_path):
     """
@@ -352,17 +528,39 @@ def process_file(file_path):
         file_path: Path to the .mbx file.
 
     Returns:
-        List of patch dictionaries from the file.
+        List of patch dictionaries from the file and the (name, email) pairs found in it.
     """
     # if '_PATCH_net_v1__net__stmmac__TSO__Fix_unbalanced_DMA_map_unmap_for_non-paged_SKB_data' not in file_path:
     #     return []
 
     return parse_emails_from_mbx(file_path)
 
+def iter_mbx_files(directory):
+    """
+    Yields the paths of the .mbx files under directory, in the same order as os.walk
+    (a directory's files before its subdirectories), without os.walk's per-directory lists.
+
+    Args:
+        directory: The directory to search.
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():  # os.walk doesn't follow directory links either
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(".mbx"):
+                yield entry.path
+    for subdir in subdirs:
+        yield from iter_mbx_files(subdir)
+
 def walk_and_process(input_dir, file_limit=None):
     """
     Walks through the input directory to find .mbx files
-    and processes each one sequentially with progress tracking.
+    and processes them with progress tracking.  The files are parsed in worker
+    processes, the results are merged into data_store here in the main process.
+    Where workers are spawned rather than forked (Windows, macOS) a script calling
+    this has to do so from under an if __name__ == "__main__": guard.
 
     Args:
         input_dir: The base directory to search.
@@ -374,12 +572,7 @@ def walk_and_process(input_dir, file_limit=None):
         return
 
     # Gather all .mbx file paths
-    mbx_files = []
-    for root, dirs, files in os.walk(input_dir):
-        for file in files:
-            if file.endswith(".mbx"):
-                file_path = os.path.join(root, file)
-                mbx_files.append(file_path)
+    mbx_files = list(iter_mbx_files(input_dir))
 
     # If file_limit is specified and positive, slice the list
     if file_limit and file_limit > 0:
@@ -387,20 +580,24 @@ def walk_and_process(input_dir, file_limit=None):
 
     print(f"Found {len(mbx_files)} .mbx files to process.")
 
-    # Add progress bar
-    with Progress(
-        "[progress.description]{task.description}",
-        BarColumn(),
-        "[progress.percentage]{task.percentage:>3.0f}%",
-        TimeRemainingColumn(),
-    ) as progress:
-        task = progress.add_task("[cyan]Processing .mbx files...", total=len(mbx_files))
-
-        # Process files sequentially and update the global DataFrame
-        for file_path in mbx_files:
-            emails = process_file(file_path)
-            update_patches_data(emails, file_path)
-            progress.update(task, advance=1)
+    # Parse files in parallel, map() hands the results back in file order.  The work is all handed
+    # out before the progress bar starts its refresh thread, so the workers are never forked while
+    # that thread may be holding the console's locks
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        results = executor.map(process_file, mbx_files, chunksize=parse_chunksize)
+
+        with Progress(
+            "[progress.description]{task.description}",
+            BarColumn(),
+            "[progress.percentage]{task.percentage:>3.0f}%",
+            TimeRemainingColumn(),
+        ) as progress:
+            task = progress.add_task("[cyan]Processing .mbx files...", total=len(mbx_files))
+
+            for file_path, (emails, name_pairs) in zip(mbx_files, results):
+                name_pairs_buffer.extend(name_pairs)
+                update_patches_data(emails, file_path)
+                progress.update(task, advance=1)
 
     finalize_patches_data()
     print_metrics(10)
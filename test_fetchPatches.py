@@ -0,0 +1,34 @@
+import gzip
+import unittest
+
+from fetchPatches import GunzipStream
+
+
+def gunzip_in_chunks(payload, chunk_size):
+    """Feed payload through a GunzipStream chunk_size bytes at a time."""
+    gunzip = GunzipStream()
+    data = b"".join(gunzip.decompress(payload[i:i + chunk_size]) for i in range(0, len(payload), chunk_size))
+    gunzip.finish()
+    return data
+
+
+class GunzipStreamTest(unittest.TestCase):
+    def test_padded_two_member_payload(self):
+        # zero padding after each member, as some servers and tools write it
+        payload = gzip.compress(b"first member\n") + b"\x00" * 10 + gzip.compress(b"second member\n") + b"\x00" * 5
+        expected = gzip.decompress(payload)
+        self.assertEqual(expected, b"first member\nsecond member\n")
+
+        # the whole payload at once, and in chunks small enough to split the padding and the gzip headers
+        for chunk_size in (len(payload), 7, 3, 1):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(gunzip_in_chunks(payload, chunk_size), expected)
+
+    def test_truncated_member(self):
+        payload = gzip.compress(b"a member that gets cut short\n")[:-4]
+        with self.assertRaises(EOFError):
+            gunzip_in_chunks(payload, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()